@@ -44,4 +44,7 @@ fi
   --include-diff-stats "${INPUT_INCLUDE_DIFF_STATS:-true}" \
   --custom-prompt "${INPUT_CUSTOM_PROMPT:-}" \
   --frontend-context-file "${INPUT_FRONTEND_CONTEXT_FILE:-}" \
-  --generate-test-plan "${INPUT_GENERATE_TEST_PLAN:-false}"
+  --generate-test-plan "${INPUT_GENERATE_TEST_PLAN:-false}" \
+  --no-llm "${INPUT_NO_LLM:-false}" \
+  --use-batch-api "${INPUT_USE_BATCH_API:-false}" \
+  --max-files-in-table "${INPUT_MAX_FILES_IN_TABLE:-50}"
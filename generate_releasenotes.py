@@ -3,13 +3,33 @@
 Generate release notes by comparing releases across multiple repositories using AI.
 """
 import sys
+import re
+import hashlib
 import requests
 import argparse
 import json
 import os
-from datetime import datetime
-import openai
-from openai import AzureOpenAI
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# openai (and its pydantic/httpx dependency tree) costs hundreds of ms to
+# import, so it is imported lazily inside the functions that need it; runs
+# that fail early or use --no-llm never pay for it.
+
+# Optional exact tokenizer; when unavailable we fall back to the
+# chars-per-token heuristic.
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Optional fast JSON parser for the large compare payloads
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 SAMPLE_PROMPT = """
 Write a brief summary of the key changes in this release. Be concise, complete, and avoid redundancy. Each bullet point should cover a distinct change.
@@ -83,29 +103,372 @@ Go straight to the point. The following changes took place:
 """
 
 
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant who writes brief, concise release summaries. Each bullet point should cover a distinct change without overlapping with others. Be complete but not extensive. No headers, no lengthy explanations - just the key changes."
+
+TEST_PLAN_SYSTEM_PROMPT = "You are a QA engineer. Create a brief test plan with only the essential test scenarios. No title, no headers - start directly with the bullet list. Keep it short - max 10 bullet points total."
+
+# Static message prefixes, built once and kept byte-identical across calls so
+# OpenAI's automatic prompt caching can reuse the prefix; only the final user
+# message changes per repository.
+SUMMARY_MESSAGE_PREFIX = (
+    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+    {"role": "user", "content": SAMPLE_PROMPT},
+    {"role": "assistant", "content": GOOD_SAMPLE_RESPONSE},
+)
+
+TEST_PLAN_MESSAGE_PREFIX = (
+    {"role": "system", "content": TEST_PLAN_SYSTEM_PROMPT},
+    {"role": "user", "content": TEST_PLAN_SAMPLE_PROMPT},
+    {"role": "assistant", "content": TEST_PLAN_SAMPLE_RESPONSE},
+)
+
+
+# File patterns to exclude (non-business code): CI/CD, container and build files
+EXCLUDED_PATTERNS = (
+    '.github/',           # GitHub Actions, workflows
+    '.devcontainer/',     # Dev container configurations
+    'Dockerfile',         # Container images
+    'docker-compose',     # Docker compose files
+    '.dockerignore',      # Docker ignore files
+    'Jenkinsfile',        # Jenkins pipelines
+    '.gitlab-ci',         # GitLab CI
+    '.travis',            # Travis CI
+    'azure-pipelines',    # Azure DevOps
+    '.circleci/',         # CircleCI
+    'bitbucket-pipelines', # Bitbucket pipelines
+    'Makefile',           # Build automation
+    '.yml',               # Generic YAML configs (often CI/CD)
+    '.yaml',              # Generic YAML configs (often CI/CD)
+)
+
+# File extensions to always include (business code)
+INCLUDED_EXTENSIONS = (
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.go', '.rs', '.rb', '.php',
+    '.cs', '.cpp', '.c', '.h', '.hpp', '.swift', '.kt', '.scala', '.vue',
+    '.sql', '.graphql', '.proto', '.json', '.xml', '.html', '.css', '.scss',
+    '.txt', '.md', '.rst',  # Documentation and text files
+)
+
+# Specific icon definition files and image asset extensions
+ICON_FILE_SUFFIXES = ('icons.js', 'icons.ts', 'icons.jsx', 'icons.tsx')
+ICON_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp')
+
+# Helm chart file patterns (substring matches)
+HELM_PATTERNS = (
+    'chart.yaml', 'chart.yml',
+    'values.yaml', 'values.yml',
+    '/templates/',
+    '/charts/',
+    'helmfile.yaml', 'helmfile.yml',
+)
+
+# Extension membership is a hash lookup on the splitext suffix
+_INCLUDED_EXTENSION_SET = frozenset(INCLUDED_EXTENSIONS)
+
+# Precompiled alternations: one C-level scan per filename instead of a Python
+# loop over every pattern.
+_EXCLUDED_RE = re.compile('|'.join(re.escape(p.lower()) for p in EXCLUDED_PATTERNS))
+_HELM_RE = re.compile('|'.join(re.escape(p) for p in HELM_PATTERNS))
+
+
+# Source-code suffixes of icon definition files whose diffs are summarized
+# instead of included verbatim
+ICON_CODE_SUFFIXES = ('.js', '.ts', '.jsx', '.tsx')
+
+# Icon definition patterns in added diff lines: "export const iconName" and
+# object-key forms (iconName:, "iconName":, 'iconName':). The union regex is
+# anchored to added lines (+ but not ++) so one multiline finditer scans the
+# whole patch without a per-line Python loop.
+_ICON_LINE_RE = re.compile(
+    r'^\+(?!\+)(?:.*?export\s+(?:const|let|var)\s+(\w+)'
+    r'|.*?["\']?(\w+(?:-\w+)*)["\']?\s*:\s*[\'"`<{])',
+    re.MULTILINE)
+
+# Object keys that look like icon definitions but are SVG attributes
+NON_ICON_KEYS = frozenset({
+    'viewBox', 'fill', 'stroke', 'width', 'height', 'd', 'path', 'xmlns',
+    'class', 'style',
+})
+
+# Classification flags returned by classify_file
+FILE_INCLUDE = 1
+FILE_ICON = 2
+FILE_HELM = 4
+
+
+def classify_file(filename_lower: str) -> int:
+    """
+    Classify an already-lowercased filename in a single pass.
+    Returns a bitmask of FILE_INCLUDE / FILE_ICON / FILE_HELM flags.
+    """
+    flags = 0
+    if (filename_lower.endswith(ICON_FILE_SUFFIXES)
+            or filename_lower.endswith(ICON_EXTENSIONS)):
+        flags |= FILE_ICON
+    if _HELM_RE.search(filename_lower):
+        flags |= FILE_HELM
+
+    # Business code extensions, icon and helm files are included in the notes
+    # unless an exclude pattern (CI/CD, build files) matches first.
+    if not _EXCLUDED_RE.search(filename_lower):
+        if flags or os.path.splitext(filename_lower)[1] in _INCLUDED_EXTENSION_SET:
+            flags |= FILE_INCLUDE
+
+    return flags
+
+
+def extract_new_icons_from_diff(patch: str) -> list:
+    """Extract only newly added icon names from an icons.js/ts diff."""
+    new_icons = []
+    for match in _ICON_LINE_RE.finditer(patch):
+        export_name, key_name = match.groups()
+        if export_name:
+            new_icons.append(export_name)
+        # Filter out common non-icon keys
+        elif key_name not in NON_ICON_KEYS:
+            new_icons.append(key_name)
+    return new_icons
+
+
+def is_icon_file(filename: str) -> bool:
+    """Check if file is an icon or image asset."""
+    return bool(classify_file(filename.lower()) & FILE_ICON)
+
+
+def is_helm_chart_file(filename: str) -> bool:
+    """Check if file is part of a Helm chart."""
+    return bool(classify_file(filename.lower()) & FILE_HELM)
+
+
+def should_include_file(filename: str) -> bool:
+    """Check if file should be included in release notes."""
+    return bool(classify_file(filename.lower()) & FILE_INCLUDE)
+
+
+# Approximate characters per token, used when tiktoken is unavailable
+CHARACTERS_PER_TOKEN = 4
+
+def _json_loads(data):
+    """Parse JSON with orjson when available; it is 2-5x faster on the
+    multi-megabyte compare payloads."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Directory for cached GitHub and AI responses; reruns of unchanged
+# comparisons skip the download and/or the LLM call.
+CACHE_DIR = os.environ.get("RELEASE_NOTES_CACHE_DIR", ".release-notes-cache")
+
+_token_encoder = None
+
+
+def _get_token_encoder():
+    """Return the cached tiktoken encoder, or None if tiktoken is unavailable."""
+    global _token_encoder
+    if _token_encoder is None and tiktoken is not None:
+        try:
+            _token_encoder = tiktoken.encoding_for_model("gpt-4o")
+        except Exception:
+            _token_encoder = tiktoken.get_encoding("cl100k_base")
+    return _token_encoder
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> tuple[str, bool]:
+    """
+    Truncate text to at most max_tokens tokens.
+    Returns the (possibly truncated) text and whether truncation happened.
+    """
+    encoder = _get_token_encoder()
+    if encoder is not None:
+        tokens = encoder.encode(text)
+        if len(tokens) <= max_tokens:
+            return text, False
+        return encoder.decode(tokens[:max_tokens]), True
+
+    max_chars = max_tokens * CHARACTERS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text, False
+    return text[:max_chars], True
+
+
+# Retry policy for transient GitHub/OpenAI failures
+MAX_RETRIES = 4
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _backoff_sleep(delay: float) -> float:
+    """Sleep for delay plus jitter and return the next (doubled) delay."""
+    time.sleep(delay + random.uniform(0, delay / 2))
+    return min(delay * 2, 30.0)
+
+
+def _request_with_retries(session: requests.Session, url: str, headers: dict = None):
+    """
+    GET with exponential backoff and jitter on transient failures,
+    honoring Retry-After on rate-limited responses.
+    """
+    delay = 1.0
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = session.get(url, headers=headers)
+        except requests.RequestException as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print(f"Request to {url} failed ({e}), retrying in ~{delay:.0f}s...")
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            print(f"Got {response.status_code} from {url}, retrying in ~{delay:.0f}s...")
+        delay = _backoff_sleep(delay)
+
+
+def count_patch_changes(diff_text: str) -> tuple[int, int]:
+    """
+    Count added and deleted lines in a diff with C-level str.count calls
+    ("+"/"-" lines, excluding "++"/"--" headers) instead of iterating
+    line by line in Python.
+    """
+    if not diff_text:
+        return 0, 0
+    additions = diff_text.count("\n+") - diff_text.count("\n++")
+    deletions = diff_text.count("\n-") - diff_text.count("\n--")
+    if diff_text.startswith("+") and not diff_text.startswith("++"):
+        additions += 1
+    elif diff_text.startswith("-") and not diff_text.startswith("--"):
+        deletions += 1
+    return additions, deletions
+
+
+def compress_patch(patch: str, head: int = 20, tail: int = 10) -> str:
+    """
+    Excerpt an oversized patch: keep the first head and last tail lines and
+    replace the middle with an omission marker. Patches short enough to fit
+    are returned unchanged.
+    """
+    lines = patch.split("\n")
+    if len(lines) <= head + tail + 1:
+        return patch
+    omitted = len(lines) - head - tail
+    return "\n".join(lines[:head] + [f"... ({omitted} lines omitted) ..."] + lines[-tail:])
+
+
+def _slim_compare_payload(compare_data: dict) -> dict:
+    """
+    Keep only the compare payload fields the rest of the pipeline reads.
+    The raw payload can be tens of MB (every commit object, every file's
+    URLs and blob metadata); dropping the unused fields right after parsing
+    shrinks both peak memory and the on-disk cache.
+    """
+    return {
+        "total_commits": compare_data.get("total_commits", 0),
+        "commits": [
+            {"commit": {"message": commit.get("commit", {}).get("message", "")}}
+            for commit in compare_data.get("commits", [])
+        ],
+        "files": [
+            {
+                "filename": file_info.get("filename", "unknown"),
+                "status": file_info.get("status", "modified"),
+                "additions": file_info.get("additions", 0),
+                "deletions": file_info.get("deletions", 0),
+                "patch": file_info.get("patch", ""),
+            }
+            for file_info in compare_data.get("files", [])
+        ],
+    }
+
+
+def _read_cached_compare(cache_file: str) -> tuple[str, dict]:
+    """Return the cached (etag, compare payload) for a compare URL, if any."""
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            return cached.get("etag"), cached.get("data")
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read cached compare response: {e}")
+    return None, None
+
+
+def _write_cached_compare(cache_file: str, etag: str, data: dict):
+    """Persist a compare payload with its ETag for conditional GETs."""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"etag": etag, "data": data}, f)
+    except OSError as e:
+        print(f"Warning: Could not write compare cache: {e}")
+
+
 def get_compare_diff(github_api_url: str, repo: str, from_release: str, to_release: str, 
-                     authorization_header: dict) -> tuple[str, dict]:
+                     session: requests.Session, max_chars: int = 28000) -> tuple[str, dict]:
     """
     Get the diff between two releases/tags for a repository.
     Returns the diff content and statistics.
+
+    Patches are emitted largest-first under a max_chars budget so that the
+    prompt truncation downstream never silently drops whole files.
+
+    This intentionally uses the REST compare endpoint: the GraphQL API does
+    not expose per-file patches, so batching compares through GraphQL would
+    still need one REST call per repository for the diffs themselves.
     """
     compare_url = f"{github_api_url}/repos/{repo}/compare/{from_release}...{to_release}"
     
     print(f"Fetching comparison for {repo}: {from_release} -> {to_release}")
-    
-    response = requests.get(compare_url, headers=authorization_header)
-    
-    if response.status_code != requests.codes.ok:
+
+    # Conditional GET: send the cached ETag so GitHub can answer 304 with no
+    # body (which also does not count against the rate limit).
+    cache_file = os.path.join(CACHE_DIR, "etags", f"{hashlib.sha1(compare_url.encode('utf-8')).hexdigest()}.json")
+    cached_etag, cached_data = _read_cached_compare(cache_file)
+
+    request_headers = {"If-None-Match": cached_etag} if cached_etag else None
+    response = _request_with_retries(session, compare_url, headers=request_headers)
+
+    if response.status_code == requests.codes.not_modified and cached_data is not None:
+        print(f"Compare for {repo} unchanged, using cached response")
+        compare_data = cached_data
+    elif response.status_code != requests.codes.ok:
         print(f"Failed to get comparison for {repo}: {response.status_code}")
         print(f"Response: {response.text}")
         return None, None
+    else:
+        compare_data = _json_loads(response.content)
+
+        # Follow pagination: compares spanning more than 250 commits expose
+        # further pages via the Link header. Merge commits and any extra
+        # files (deduplicated by name) before slimming.
+        next_url = response.links.get("next", {}).get("url")
+        while next_url:
+            print(f"Fetching next compare page for {repo}...")
+            page_response = _request_with_retries(session, next_url)
+            if page_response.status_code != requests.codes.ok:
+                print(f"Failed to fetch compare page for {repo}: {page_response.status_code}")
+                break
+            page_data = _json_loads(page_response.content)
+            compare_data.setdefault("commits", []).extend(page_data.get("commits", []))
+            seen_files = {f.get("filename") for f in compare_data.get("files", [])}
+            for file_info in page_data.get("files", []):
+                if file_info.get("filename") not in seen_files:
+                    compare_data.setdefault("files", []).append(file_info)
+                    seen_files.add(file_info.get("filename"))
+            next_url = page_response.links.get("next", {}).get("url")
+
+        compare_data = _slim_compare_payload(compare_data)
+        etag = response.headers.get("ETag")
+        if etag:
+            _write_cached_compare(cache_file, etag, compare_data)
     
-    compare_data = response.json()
-    
+    files = compare_data.get("files", [])
+
     # Extract statistics
     stats = {
         "total_commits": len(compare_data.get("commits", [])),
-        "files_changed": len(compare_data.get("files", [])),
+        "files_changed": len(files),
         "additions": compare_data.get("total_commits", 0),
         "deletions": 0,
     }
@@ -114,112 +477,20 @@ def get_compare_diff(github_api_url: str, repo: str, from_release: str, to_relea
     total_additions = 0
     total_deletions = 0
     
-    diff_content = f"\n### Repository: {repo}\n"
-    diff_content += f"**Comparing:** {from_release} → {to_release}\n\n"
-    
-    # File patterns to exclude (non-business code)
-    excluded_patterns = [
-        '.github/',           # GitHub Actions, workflows
-        '.devcontainer/',     # Dev container configurations
-        'Dockerfile',         # Container images
-        'docker-compose',     # Docker compose files
-        '.dockerignore',      # Docker ignore files
-        'Jenkinsfile',        # Jenkins pipelines
-        '.gitlab-ci',         # GitLab CI
-        '.travis',            # Travis CI
-        'azure-pipelines',    # Azure DevOps
-        '.circleci/',         # CircleCI
-        'bitbucket-pipelines', # Bitbucket pipelines
-        'Makefile',           # Build automation
-        '.yml',               # Generic YAML configs (often CI/CD)
-        '.yaml',              # Generic YAML configs (often CI/CD)
-    ]
-    
-    # File extensions to always include (business code)
-    included_extensions = [
-        '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.go', '.rs', '.rb', '.php',
-        '.cs', '.cpp', '.c', '.h', '.hpp', '.swift', '.kt', '.scala', '.vue',
-        '.sql', '.graphql', '.proto', '.json', '.xml', '.html', '.css', '.scss',
-        '.txt', '.md', '.rst',  # Documentation and text files
-    ]
-    
-    def is_icon_file(filename: str) -> bool:
-        """Check if file is an icon or image asset."""
-        filename_lower = filename.lower()
-        
-        # Specific icon files
-        icon_files = ['icons.js', 'icons.ts', 'icons.jsx', 'icons.tsx']
-        if any(filename_lower.endswith(f) for f in icon_files):
-            return True
-        
-        # Image asset files
-        icon_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp']
-        for ext in icon_extensions:
-            if filename_lower.endswith(ext):
-                return True
-        
-        return False
+    # Accumulate output in a list and join once at the end; repeated string
+    # concatenation is quadratic in the total diff size.
+    diff_parts = [f"\n### Repository: {repo}\n",
+                  f"**Comparing:** {from_release} → {to_release}\n\n"]
     
-    def is_helm_chart_file(filename: str) -> bool:
-        """Check if file is part of a Helm chart."""
-        filename_lower = filename.lower()
-        helm_patterns = [
-            'chart.yaml', 'chart.yml',
-            'values.yaml', 'values.yml',
-            '/templates/',
-            '/charts/',
-            'helmfile.yaml', 'helmfile.yml',
-        ]
-        return any(pattern in filename_lower for pattern in helm_patterns)
-    
-    def should_include_file(filename: str) -> bool:
-        """Check if file should be included in release notes."""
-        filename_lower = filename.lower()
-        
-        # Exclude files matching excluded patterns
-        for pattern in excluded_patterns:
-            if pattern.lower() in filename_lower:
-                return False
-        
-        # Include files with business code extensions
-        for ext in included_extensions:
-            if filename_lower.endswith(ext):
-                return True
-        
-        # Also include icon files and helm chart files
-        if is_icon_file(filename) or is_helm_chart_file(filename):
-            return True
-        
-        # Exclude other files by default
-        return False
-    
-    files = compare_data.get("files", [])
-    
-    def extract_new_icons_from_diff(patch: str) -> list:
-        """Extract only newly added icon names from icons.js diff."""
-        new_icons = []
-        for line in patch.split('\n'):
-            # Only look at added lines (starting with +, but not ++)
-            if line.startswith('+') and not line.startswith('++'):
-                # Common patterns for icon definitions:
-                # export const iconName = ...
-                # iconName: ...
-                # "iconName": ...
-                # 'iconName': ...
-                import re
-                # Match export const/let/var iconName
-                match = re.search(r'export\s+(?:const|let|var)\s+(\w+)', line)
-                if match:
-                    new_icons.append(match.group(1))
-                    continue
-                # Match object key patterns: iconName: or "iconName": or 'iconName':
-                match = re.search(r'["\']?(\w+(?:-\w+)*)["\']?\s*:\s*[\'"`<{]', line)
-                if match:
-                    icon_name = match.group(1)
-                    # Filter out common non-icon keys
-                    if icon_name not in ['viewBox', 'fill', 'stroke', 'width', 'height', 'd', 'path', 'xmlns', 'class', 'style']:
-                        new_icons.append(icon_name)
-        return new_icons
+    # Emit the highest-signal (largest) patches first and stop once the
+    # character budget is spent, instead of building a megabyte-sized string
+    # that gets hard-truncated later.
+    files = sorted(files, key=lambda f: f.get("additions", 0) + f.get("deletions", 0),
+                   reverse=True)
+    stats["changed_files"] = [f.get("filename", "unknown") for f in files]
+    patch_budget = max_chars
+    omitted_files = 0
+    files_included = 0
 
     # Track special file changes for user awareness
     icon_changes = []
@@ -227,25 +498,31 @@ def get_compare_diff(github_api_url: str, repo: str, from_release: str, to_relea
     helm_chart_changes = []
     
     for file_info in files:
+        # Lowercase and classify each filename exactly once per file
         filename = file_info.get("filename", "unknown")
+        filename_lower = filename.lower()
         patch = file_info.get("patch", "")
-        
+        flags = classify_file(filename_lower)
+
         # Track icon changes and extract new icons
-        if is_icon_file(filename):
+        is_icon_code = bool(flags & FILE_ICON) and filename_lower.endswith(ICON_CODE_SUFFIXES)
+        new_icons = []
+        if flags & FILE_ICON:
             icon_changes.append(filename)
             # For icons.js/ts files, extract newly added icon names
-            if filename.lower().endswith(('.js', '.ts', '.jsx', '.tsx')):
+            if is_icon_code:
                 new_icons = extract_new_icons_from_diff(patch)
                 new_icons_added.extend(new_icons)
-        
+
         # Track helm chart changes
-        if is_helm_chart_file(filename):
+        if flags & FILE_HELM:
             helm_chart_changes.append(filename)
-        
+
         # Skip non-business code files
-        if not should_include_file(filename):
+        if not flags & FILE_INCLUDE:
             continue
-        
+
+        files_included += 1
         status = file_info.get("status", "modified")
         additions = file_info.get("additions", 0)
         deletions = file_info.get("deletions", 0)
@@ -254,49 +531,268 @@ def get_compare_diff(github_api_url: str, repo: str, from_release: str, to_relea
         total_deletions += deletions
         
         # For icon files, only show summary of new icons instead of full diff
-        if is_icon_file(filename) and filename.lower().endswith(('.js', '.ts', '.jsx', '.tsx')):
-            new_icons = extract_new_icons_from_diff(patch)
+        if is_icon_code:
             if new_icons:
-                diff_content += f"Changes in file {filename} ({status}, +{additions}/-{deletions}): New icons added: {', '.join(new_icons)}\n"
+                block_parts = (f"Changes in file {filename} ({status}, +{additions}/-{deletions}): New icons added: {', '.join(new_icons)}\n",)
             else:
-                diff_content += f"Changes in file {filename} ({status}, +{additions}/-{deletions}): Icon content updated (no new icons added)\n"
+                block_parts = (f"Changes in file {filename} ({status}, +{additions}/-{deletions}): Icon content updated (no new icons added)\n",)
         elif patch:
-            diff_content += f"Changes in file {filename} ({status}, +{additions}/-{deletions}): {patch}\n"
+            # Keep the (potentially large) patch as its own part instead of
+            # copying it into a new header+patch string.
+            block_parts = (f"Changes in file {filename} ({status}, +{additions}/-{deletions}): ", patch, "\n")
+        else:
+            continue
+
+        block_len = sum(map(len, block_parts))
+        if block_len > patch_budget and patch and len(block_parts) == 3:
+            # Excerpt the patch head/tail rather than dropping the file outright
+            block_parts = (block_parts[0], compress_patch(patch), "\n")
+            block_len = sum(map(len, block_parts))
+        if block_len > patch_budget:
+            omitted_files += 1
+            continue
+
+        diff_parts.extend(block_parts)
+        patch_budget -= block_len
     
+    if omitted_files:
+        diff_parts.append(f"\n(Note: {omitted_files} more file(s) omitted to stay within the diff size budget)\n")
+
+    # GitHub caps the files array at 300 regardless of pagination
+    if len(files) >= 300:
+        diff_parts.append("\n(Note: GitHub limits compare file lists to 300; additional changed files may be missing)\n")
+
     # Add notes about special file changes that require user attention
     if icon_changes or helm_chart_changes:
-        diff_content += "\n### Additional Updates Required:\n"
+        diff_parts.append("\n### Additional Updates Required:\n")
         if icon_changes:
-            diff_content += f"\n**Icon/Image changes detected** (may require asset updates):\n"
+            diff_parts.append(f"\n**Icon/Image changes detected** (may require asset updates):\n")
             for icon_file in icon_changes:
-                diff_content += f"- {icon_file}\n"
+                diff_parts.append(f"- {icon_file}\n")
             if new_icons_added:
-                diff_content += f"\n**New icons added:** {', '.join(set(new_icons_added))}\n"
+                diff_parts.append(f"\n**New icons added:** {', '.join(set(new_icons_added))}\n")
         if helm_chart_changes:
-            diff_content += f"\n**Helm chart changes detected** (may require chart version updates):\n"
+            diff_parts.append(f"\n**Helm chart changes detected** (may require chart version updates):\n")
             for helm_file in helm_chart_changes:
-                diff_content += f"- {helm_file}\n"
+                diff_parts.append(f"- {helm_file}\n")
     
     stats["additions"] = total_additions
     stats["deletions"] = total_deletions
     stats["icon_changes"] = icon_changes
     stats["helm_chart_changes"] = helm_chart_changes
+    stats["files_included"] = files_included
     
     # Also include commit messages as context
     commits = compare_data.get("commits", [])
     total_commits_count = compare_data.get("total_commits", len(commits))
     
+    commit_messages = [commit.get("commit", {}).get("message", "").split("\n")[0]
+                       for commit in commits]
+    stats["commit_messages"] = commit_messages
+
     if commits:
-        diff_content += "\nCommit messages:\n"
-        for commit in commits:
-            commit_message = commit.get("commit", {}).get("message", "").split("\n")[0]
-            diff_content += f"- {commit_message}\n"
+        diff_parts.append("\nCommit messages:\n")
+        for commit_message in commit_messages:
+            diff_parts.append(f"- {commit_message}\n")
         
         # Note if there are more commits than returned (GitHub API limits to 250 per compare)
         if total_commits_count > len(commits):
-            diff_content += f"\n(Note: Showing {len(commits)} of {total_commits_count} total commits)\n"
+            diff_parts.append(f"\n(Note: Showing {len(commits)} of {total_commits_count} total commits)\n")
+    
+    return "".join(diff_parts), stats
+
+
+# In-process cache so duplicate repo configs in a single run also short-circuit
+_summary_cache = {}
+
+
+def _summary_cache_key(model: str, temperature: float, prompt: str) -> str:
+    """Content hash identifying one summarization request."""
+    return hashlib.sha256(f"{model}:{temperature}:{prompt}".encode("utf-8")).hexdigest()
+
+
+def _read_cached_summary(key: str) -> str:
+    """Return a previously cached summary, or empty string on a miss."""
+    if key in _summary_cache:
+        return _summary_cache[key]
+    cache_file = os.path.join(CACHE_DIR, f"{key}.json")
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get("summary", "")
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read cached summary: {e}")
+    return ""
+
+
+def _write_cached_summary(key: str, summary: str):
+    """Persist a generated summary for reruns of the same comparison."""
+    _summary_cache[key] = summary
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        cache_file = os.path.join(CACHE_DIR, f"{key}.json")
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"summary": summary,
+                       "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())}, f)
+    except OSError as e:
+        print(f"Warning: Could not write summary cache: {e}")
+
+
+# Shared chat-completions client: constructing OpenAI/AzureOpenAI builds a
+# fresh httpx connection pool each time, so create it once and reuse it.
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def _get_openai_client(openai_api_key: str, azure_openai_api_key: str,
+                       azure_openai_endpoint: str, azure_openai_version: str):
+    """
+    Return the shared OpenAI or Azure OpenAI client, creating it on first use.
+    Returns None when Azure is selected but no endpoint is configured.
+    """
+    import openai
+    from openai import AzureOpenAI
+
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is not None:
+            return _openai_client
+
+        if openai_api_key and openai_api_key.strip():
+            _openai_client = openai.OpenAI(api_key=openai_api_key.strip())
+        elif azure_openai_api_key and azure_openai_api_key.strip():
+            if not azure_openai_endpoint or not azure_openai_endpoint.strip():
+                print("Error: Azure OpenAI endpoint is required when using Azure OpenAI API key")
+                return None
+            _openai_client = AzureOpenAI(
+                api_key=azure_openai_api_key.strip(),
+                azure_endpoint=azure_openai_endpoint.strip(),
+                api_version=azure_openai_version.strip() if azure_openai_version else "2024-02-15-preview"
+            )
+        return _openai_client
+
+
+# Conventional-commit prefixes and the section label they map to in the
+# extractive (no-LLM) summary
+CONVENTIONAL_COMMIT_SECTIONS = (
+    ('feat', 'New features'),
+    ('fix', 'Bug fixes'),
+    ('perf', 'Performance'),
+    ('refactor', 'Refactoring'),
+    ('docs', 'Documentation'),
+    ('test', 'Tests'),
+    ('chore', 'Maintenance'),
+)
+
+
+def generate_extractive_summary(commit_messages: list) -> str:
+    """
+    Build a local, zero-cost summary from commit messages, grouped by
+    conventional-commit prefix. Used when --no-llm is set or no API key is
+    available.
+    """
+    grouped = {label: [] for _, label in CONVENTIONAL_COMMIT_SECTIONS}
+    other = []
+    seen = set()
+
+    for message in commit_messages:
+        first_line = message.strip()
+        if not first_line or first_line.lower() in seen:
+            continue
+        seen.add(first_line.lower())
+
+        prefix, _, rest = first_line.partition(':')
+        # Strip an optional scope, e.g. "feat(api):"
+        prefix = prefix.split('(')[0].strip().lower()
+        for conventional_prefix, label in CONVENTIONAL_COMMIT_SECTIONS:
+            if rest and prefix == conventional_prefix:
+                grouped[label].append(rest.strip())
+                break
+        else:
+            other.append(first_line)
+
+    summary_parts = []
+    for _, label in CONVENTIONAL_COMMIT_SECTIONS:
+        for entry in grouped[label]:
+            summary_parts.append(f"- **{label}**: {entry}\n")
+    for entry in other:
+        summary_parts.append(f"- {entry}\n")
+
+    if not summary_parts:
+        return "- No commit messages available for this comparison\n"
+    return "".join(summary_parts)
+
+
+def _openai_call_with_retries(call):
+    """Run one OpenAI SDK call with the shared backoff policy."""
+    import openai
+
+    delay = 1.0
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return call()
+        except (openai.RateLimitError, openai.APIConnectionError,
+                openai.InternalServerError) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print(f"OpenAI request failed ({e}), retrying in ~{delay:.0f}s...")
+            delay = _backoff_sleep(delay)
+
+
+def _stream_chat_completion(client, model: str, messages: list, max_tokens: int,
+                            label: str = "") -> str:
+    """
+    Run a chat completion with stream=True and collect the delta chunks as
+    they arrive, so tokens flow in while the model is still generating
+    instead of blocking on the full response. The collected text is echoed
+    to the log in a single write per completion: these calls run from
+    concurrent worker threads, so live per-token echoing would interleave
+    fragments of different completions.
+    """
+    import openai
+
+    delay = 1.0
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_completion_tokens=max_tokens,
+                stream=True,
+            )
+            chunks = []
+            for event in stream:
+                if event.choices and event.choices[0].delta.content:
+                    chunks.append(event.choices[0].delta.content)
+            text = "".join(chunks)
+            if text and label:
+                sys.stdout.write(f"\n--- {label} ---\n{text}\n")
+                sys.stdout.flush()
+            return text
+        except (openai.RateLimitError, openai.APIConnectionError,
+                openai.InternalServerError) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print(f"OpenAI request failed ({e}), retrying in ~{delay:.0f}s...")
+            delay = _backoff_sleep(delay)
+
+
+# Token budget for summarization prompts
+MAX_SUMMARY_PROMPT_TOKENS = 8000
+
+
+def build_summary_prompt(diff_content: str, repo: str, from_release: str,
+                         to_release: str, custom_prompt: str) -> str:
+    """Build the (token-budgeted) user prompt for one repository summary."""
+    completion_prompt = custom_prompt if custom_prompt else COMPLETION_PROMPT
+    completion_prompt += f"\n\nRepository: {repo}\nComparing: {from_release} → {to_release}\n\n"
+    completion_prompt += diff_content
     
-    return diff_content, stats
+    # Truncate at an exact token boundary (or ~4 chars/token without tiktoken)
+    completion_prompt, truncated = truncate_to_tokens(completion_prompt, MAX_SUMMARY_PROMPT_TOKENS)
+    if truncated:
+        print(f"Warning: Prompt truncated to {MAX_SUMMARY_PROMPT_TOKENS} tokens for {repo}")
+    return completion_prompt
 
 
 def generate_ai_summary(diff_content: str, repo: str, from_release: str, to_release: str,
@@ -307,29 +803,18 @@ def generate_ai_summary(diff_content: str, repo: str, from_release: str, to_rele
     """
     Generate AI summary for the diff content.
     """
-    completion_prompt = custom_prompt if custom_prompt else COMPLETION_PROMPT
-    completion_prompt += f"\n\nRepository: {repo}\nComparing: {from_release} → {to_release}\n\n"
-    completion_prompt += diff_content
-    
-    # Truncate if too long (approximate token limit)
-    max_allowed_tokens = 8000
-    characters_per_token = 4
-    max_allowed_characters = max_allowed_tokens * characters_per_token
-    if len(completion_prompt) > max_allowed_characters:
-        completion_prompt = completion_prompt[:max_allowed_characters]
-        print(f"Warning: Prompt truncated to {max_allowed_characters} characters for {repo}")
-    
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a helpful assistant who writes brief, concise release summaries. Each bullet point should cover a distinct change without overlapping with others. Be complete but not extensive. No headers, no lengthy explanations - just the key changes."
-        },
-        {"role": "user", "content": SAMPLE_PROMPT},
-        {"role": "assistant", "content": GOOD_SAMPLE_RESPONSE},
-        {"role": "user", "content": completion_prompt},
-    ]
-    
-    generated_summary = ""
+    completion_prompt = build_summary_prompt(diff_content, repo, from_release,
+                                             to_release, custom_prompt)
+
+    # Check the cache first: reruns and retried workflows hit the exact same
+    # prompt and can skip the model call entirely.
+    cache_key = _summary_cache_key(model, temperature, completion_prompt)
+    cached_summary = _read_cached_summary(cache_key)
+    if cached_summary:
+        print(f"Using cached summary for {repo}")
+        return cached_summary
+
+    messages = [*SUMMARY_MESSAGE_PREFIX, {"role": "user", "content": completion_prompt}]
     
     # Check for non-empty API keys (strip whitespace and check for actual content)
     has_openai_key = openai_api_key and openai_api_key.strip()
@@ -338,40 +823,103 @@ def generate_ai_summary(diff_content: str, repo: str, from_release: str, to_rele
     print(f"Debug: OpenAI API key provided: {has_openai_key}")
     print(f"Debug: Azure OpenAI API key provided: {has_azure_key}")
     
-    if has_openai_key:
-        print(f"Using OpenAI API for {repo}...")
-        client = openai.OpenAI(api_key=openai_api_key.strip())
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_completion_tokens=max_tokens,
-        )
-        generated_summary = response.choices[0].message.content
-        
-    elif has_azure_key:
-        print(f"Using Azure OpenAI API for {repo}...")
-        if not azure_openai_endpoint or not azure_openai_endpoint.strip():
-            print("Error: Azure OpenAI endpoint is required when using Azure OpenAI API key")
-            return ""
-        client = AzureOpenAI(
-            api_key=azure_openai_api_key.strip(),
-            azure_endpoint=azure_openai_endpoint.strip(),
-            api_version=azure_openai_version.strip() if azure_openai_version else "2024-02-15-preview"
-        )
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_completion_tokens=max_tokens,
-        )
-        generated_summary = response.choices[0].message.content
-    else:
+    if not has_openai_key and not has_azure_key:
         print("Error: No API key provided (OpenAI or Azure OpenAI)")
         print("Please ensure you have set either 'openai_api_key' or 'azure_openai_api_key' input")
         return ""
-    
+
+    client = _get_openai_client(openai_api_key, azure_openai_api_key,
+                                azure_openai_endpoint, azure_openai_version)
+    if client is None:
+        return ""
+
+    # _get_openai_client prefers the plain OpenAI key, so label accordingly
+    print(f"Using {'OpenAI' if has_openai_key else 'Azure OpenAI'} API for {repo}...")
+    generated_summary = _stream_chat_completion(client, model, messages, max_tokens,
+                                                label=f"Summary for {repo}")
+
+    if generated_summary:
+        _write_cached_summary(cache_key, generated_summary)
+
     return generated_summary
 
 
+# Polling cadence and overall wait limit for Batch API jobs
+BATCH_POLL_INTERVAL = 15
+BATCH_TIMEOUT = 1800
+
+
+def generate_batch_summaries(prompts: dict, openai_api_key: str, model: str,
+                             max_tokens: int) -> dict:
+    """
+    Submit all summarization prompts as one OpenAI Batch API job and wait for
+    the results. Trades latency for roughly half the token cost; only used
+    when use_batch_api is enabled.
+
+    prompts maps a custom id to the final user prompt; returns a mapping of
+    custom id to generated summary for every request that succeeded.
+    """
+    import openai
+
+    client = openai.OpenAI(api_key=openai_api_key.strip())
+
+    request_lines = []
+    for custom_id, prompt in prompts.items():
+        request_lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [*SUMMARY_MESSAGE_PREFIX, {"role": "user", "content": prompt}],
+                "max_completion_tokens": max_tokens,
+            },
+        }))
+    batch_input = "\n".join(request_lines).encode("utf-8")
+
+    print(f"Submitting batch job with {len(prompts)} summarization request(s)...")
+    input_file = _openai_call_with_retries(
+        lambda: client.files.create(file=("release_notes_batch.jsonl", batch_input),
+                                    purpose="batch"))
+    batch = _openai_call_with_retries(
+        lambda: client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        ))
+
+    deadline = time.time() + BATCH_TIMEOUT
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        if time.time() > deadline:
+            print(f"Batch job {batch.id} still {batch.status} after {BATCH_TIMEOUT}s, giving up")
+            return {}
+        time.sleep(BATCH_POLL_INTERVAL)
+        batch = _openai_call_with_retries(lambda: client.batches.retrieve(batch.id))
+
+    if batch.status != "completed" or not batch.output_file_id:
+        print(f"Batch job {batch.id} ended with status: {batch.status}")
+        return {}
+
+    summaries = {}
+    output = _openai_call_with_retries(
+        lambda: client.files.content(batch.output_file_id)).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = _json_loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") == 200:
+            body = response.get("body") or {}
+            choices = body.get("choices") or []
+            if choices:
+                summaries[result["custom_id"]] = choices[0]["message"]["content"]
+        else:
+            print(f"Batch request {result.get('custom_id')} failed: {response.get('status_code')}")
+
+    print(f"Batch job completed: {len(summaries)}/{len(prompts)} summaries generated")
+    return summaries
+
+
 def read_frontend_context(file_path: str) -> str:
     """
     Read the frontend context from a file.
@@ -395,6 +943,15 @@ def read_frontend_context(file_path: str) -> str:
         return ""
 
 
+# Byte budget for the combined diff input to the test plan; whole diffs are
+# dropped past this point rather than letting token truncation cut mid-file
+TEST_PLAN_DIFF_BUDGET = 60_000
+
+# File suffixes that count as frontend changes when gating the test plan
+FRONTEND_EXTENSIONS = ('.js', '.mjs', '.jsx', '.ts', '.tsx', '.vue', '.svelte',
+                       '.astro', '.html', '.css', '.scss')
+
+
 def generate_test_plan(diff_content: str, frontend_context: str,
                        openai_api_key: str, azure_openai_api_key: str,
                        azure_openai_endpoint: str, azure_openai_version: str,
@@ -412,12 +969,13 @@ def generate_test_plan(diff_content: str, frontend_context: str,
     prompt += "## Code Changes:\n"
     prompt += diff_content
     
-    # Truncate if too long (approximate token limit)
+    # Truncate at an exact token boundary (or ~4 chars/token without tiktoken)
     max_allowed_tokens = 12000
-    characters_per_token = 4
-    max_allowed_characters = max_allowed_tokens * characters_per_token
-    if len(prompt) > max_allowed_characters:
-        # Prioritize keeping the frontend context, truncate the diff
+    prompt, truncated = truncate_to_tokens(prompt, max_allowed_tokens)
+    if truncated:
+        # Prioritize keeping the frontend context: give it and the diff an
+        # equal share of the budget, then re-truncate the rebuilt prompt.
+        max_allowed_characters = max_allowed_tokens * CHARACTERS_PER_TOKEN
         context_portion = frontend_context[:max_allowed_characters // 2]
         diff_portion = diff_content[:max_allowed_characters // 2]
         prompt = TEST_PLAN_PROMPT + "\n\n"
@@ -425,78 +983,76 @@ def generate_test_plan(diff_content: str, frontend_context: str,
         prompt += context_portion + "\n\n"
         prompt += "## Code Changes:\n"
         prompt += diff_portion
-        print(f"Warning: Test plan prompt truncated to {max_allowed_characters} characters")
+        prompt, _ = truncate_to_tokens(prompt, max_allowed_tokens)
+        print(f"Warning: Test plan prompt truncated to {max_allowed_tokens} tokens")
     
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a QA engineer. Create a brief test plan with only the essential test scenarios. No title, no headers - start directly with the bullet list. Keep it short - max 10 bullet points total."
-        },
-        {"role": "user", "content": TEST_PLAN_SAMPLE_PROMPT},
-        {"role": "assistant", "content": TEST_PLAN_SAMPLE_RESPONSE},
-        {"role": "user", "content": prompt},
-    ]
-    
-    generated_test_plan = ""
+    messages = [*TEST_PLAN_MESSAGE_PREFIX, {"role": "user", "content": prompt}]
     
     # Check for non-empty API keys
     has_openai_key = openai_api_key and openai_api_key.strip()
     has_azure_key = azure_openai_api_key and azure_openai_api_key.strip()
     
-    if has_openai_key:
-        print("Generating test plan using OpenAI API...")
-        client = openai.OpenAI(api_key=openai_api_key.strip())
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_completion_tokens=max_tokens,
-        )
-        generated_test_plan = response.choices[0].message.content
-        
-    elif has_azure_key:
-        print("Generating test plan using Azure OpenAI API...")
-        if not azure_openai_endpoint or not azure_openai_endpoint.strip():
-            print("Error: Azure OpenAI endpoint is required for test plan generation")
-            return ""
-        client = AzureOpenAI(
-            api_key=azure_openai_api_key.strip(),
-            azure_endpoint=azure_openai_endpoint.strip(),
-            api_version=azure_openai_version.strip() if azure_openai_version else "2024-02-15-preview"
-        )
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            max_completion_tokens=max_tokens,
-        )
-        generated_test_plan = response.choices[0].message.content
-    else:
+    if not has_openai_key and not has_azure_key:
         print("Error: No API key provided for test plan generation")
         return ""
+
+    client = _get_openai_client(openai_api_key, azure_openai_api_key,
+                                azure_openai_endpoint, azure_openai_version)
+    if client is None:
+        print("Error: Azure OpenAI endpoint is required for test plan generation")
+        return ""
+
+    print(f"Generating test plan using {'OpenAI' if has_openai_key else 'Azure OpenAI'} API...")
+    generated_test_plan = _stream_chat_completion(client, model, messages, max_tokens,
+                                                  label="Test plan")
     
     return generated_test_plan
 
 
-def write_github_output(name: str, value: str):
-    """Write output to GitHub Actions output file."""
+# ::set-output values must be percent-escaped; one translate pass does all
+# three substitutions at once
+_SET_OUTPUT_ESCAPES = str.maketrans({"%": "%25", "\r": "%0D", "\n": "%0A"})
+
+
+def write_github_outputs(outputs: dict):
+    """Write all outputs to the GitHub Actions output file in a single open."""
     github_output = os.environ.get("GITHUB_OUTPUT")
     if github_output:
+        # Handle multiline values with a heredoc-style delimiter
+        delimiter = "EOF"
         with open(github_output, "a") as f:
-            # Handle multiline values
-            delimiter = "EOF"
-            f.write(f"{name}<<{delimiter}\n{value}\n{delimiter}\n")
+            for name, value in outputs.items():
+                f.write(f"{name}<<{delimiter}\n{value}\n{delimiter}\n")
     else:
-        print(f"::set-output name={name}::{value}")
+        for name, value in outputs.items():
+            print(f"::set-output name={name}::{value.translate(_SET_OUTPUT_ESCAPES)}")
+
+
+# Static Markdown fragments of the release notes, built once at import
+_OVERVIEW_HEADER = ("## Overview\n\n"
+                    "This release includes changes from the following repositories:\n\n")
+_STATS_TABLE_HEADER = ("## Statistics\n\n"
+                       "| Repository | Commits | Files Changed | Additions | Deletions |\n"
+                       "|------------|---------|---------------|-----------|----------|\n")
+
+# Statistics table row templates, shared by the summary and per-file rows
+_STATS_ROW_TPL = "| {repo} | {commits} | {files} | +{additions} | -{deletions} |\n"
+_STATS_FILE_ROW_TPL = "| ↳ {name} | - | 1 | +{additions} | -{deletions} |\n"
 
 
-def write_github_summary(content: str):
-    """Write content to GitHub Actions job summary."""
+def write_github_summary(parts: list):
+    """Write the release-notes parts to the GitHub Actions job summary.
+
+    Takes the list of string parts directly so the summary streams out via
+    writelines without materializing a second copy of the joined notes.
+    """
     github_step_summary = os.environ.get("GITHUB_STEP_SUMMARY")
     if github_step_summary:
         with open(github_step_summary, "a") as f:
-            f.write(content)
+            f.writelines(parts)
     else:
         print("GITHUB_STEP_SUMMARY not set, printing to stdout:")
-        print(content)
+        print("".join(parts))
 
 
 def main():
@@ -565,20 +1121,32 @@ def main():
         "--generate-test-plan", type=str, required=False, default="false",
         help="Generate a test plan based on changes and frontend context"
     )
+    parser.add_argument(
+        "--no-llm", type=str, required=False, default="false",
+        help="Skip the LLM and build extractive summaries from commit messages"
+    )
+    parser.add_argument(
+        "--use-batch-api", type=str, required=False, default="false",
+        help="Submit all summaries as one OpenAI Batch API job (cheaper, slower)"
+    )
+    parser.add_argument(
+        "--max-files-in-table", type=int, required=False, default=50,
+        help="Maximum per-file rows in the statistics table before collapsing the rest"
+    )
     
     args = parser.parse_args()
     
     # Parse repositories JSON
     try:
-        repositories = json.loads(args.repositories) if args.repositories else []
-    except json.JSONDecodeError as e:
+        repositories = _json_loads(args.repositories) if args.repositories else []
+    except ValueError as e:
         print(f"Error parsing repositories JSON: {e}")
         repositories = []
     
     # Parse raw_diffs JSON
     try:
-        raw_diffs = json.loads(args.raw_diffs) if args.raw_diffs else []
-    except json.JSONDecodeError as e:
+        raw_diffs = _json_loads(args.raw_diffs) if args.raw_diffs else []
+    except ValueError as e:
         print(f"Error parsing raw_diffs JSON: {e}")
         raw_diffs = []
     
@@ -586,66 +1154,197 @@ def main():
         print("No repositories or raw diffs provided")
         return 1
     
-    authorization_header = {
+    # One session for all GitHub calls: keep-alive amortizes the TCP/TLS
+    # handshake across repositories.
+    session = requests.Session()
+    session.headers.update({
         "Accept": "application/vnd.github.v3+json",
         "Authorization": f"token {args.github_token}",
-    }
+    })
     
     include_stats = args.include_diff_stats.lower() == "true"
+    should_generate_test_plan = args.generate_test_plan.lower() == "true"
+
+    # Extractive summaries cost nothing and need no API key; use them when
+    # requested or when no key is configured.
+    use_llm = args.no_llm.lower() != "true"
+    has_api_key = bool((args.openai_api_key and args.openai_api_key.strip())
+                       or (args.azure_openai_api_key and args.azure_openai_api_key.strip()))
+    if use_llm and not has_api_key:
+        print("No API key provided, falling back to extractive summaries")
+        use_llm = False
+
+    # The Batch API path fetches all diffs first, then submits one job. It is
+    # only available with a plain OpenAI key.
+    use_batch_api = args.use_batch_api.lower() == "true" and use_llm
+    if use_batch_api and not (args.openai_api_key and args.openai_api_key.strip()):
+        print("Warning: use_batch_api requires an OpenAI API key; using per-repo calls")
+        use_batch_api = False
     
     # Collect all summaries
     all_summaries = []
     all_stats = []
     brief_summary_parts = []
+    # Running aggregates, accumulated as stats entries are collected
+    total_commits = 0
+    total_files = 0
+    # Diffs from the summary pass, reused by the test-plan block
+    repo_diffs = {}
     
-    for repo_config in repositories:
+    def process_repository(repo_config: dict) -> tuple[dict, str, str]:
+        """Fetch the diff and generate the AI summary for one repository.
+
+        In batch mode only the diff is fetched; summarization happens later in
+        one Batch API job. Never raises: a failure in one repository is
+        reported and returned as an empty result so the other repositories
+        still produce notes.
+        """
         repo = repo_config.get("repo")
         from_release = repo_config.get("from_release")
         to_release = repo_config.get("to_release")
-        
-        if not all([repo, from_release, to_release]):
-            print(f"Skipping invalid repository config: {repo_config}")
-            continue
-        
+
         print(f"\n{'='*60}")
         print(f"Processing: {repo}")
         print(f"From: {from_release} -> To: {to_release}")
         print(f"{'='*60}")
-        
-        # Get the diff
-        diff_content, stats = get_compare_diff(
-            args.github_api_url, repo, from_release, to_release, authorization_header
-        )
-        
-        if not diff_content:
-            print(f"Could not get diff for {repo}, skipping...")
+
+        try:
+            # Get the diff
+            diff_content, stats = get_compare_diff(
+                args.github_api_url, repo, from_release, to_release, session
+            )
+
+            if not diff_content:
+                print(f"Could not get diff for {repo}, skipping...")
+                return None, None, None
+
+            if stats:
+                stats["repo"] = repo
+                stats["from_release"] = from_release
+                stats["to_release"] = to_release
+
+            # Boilerplate-only diff (no included files, no commits): there
+            # is nothing for the model to summarize, so skip the call
+            if stats and not stats.get("files_included") and not stats.get("commit_messages"):
+                print(f"No code changes for {repo}, skipping summarization")
+                return stats, "No code changes in this release.", diff_content
+
+            # Generate the summary (AI, or extractive when the LLM is disabled)
+            if use_batch_api:
+                summary = None
+            elif use_llm:
+                summary = generate_ai_summary(
+                    diff_content, repo, from_release, to_release,
+                    args.openai_api_key, args.azure_openai_api_key,
+                    args.azure_openai_endpoint, args.azure_openai_version,
+                    args.openai_model, args.max_tokens, args.temperature,
+                    args.custom_prompt
+                )
+            else:
+                summary = generate_extractive_summary(stats.get("commit_messages", []) if stats else [])
+        except Exception as e:
+            print(f"Error processing {repo}: {e}")
+            return None, None, None
+
+        return stats, summary, diff_content
+
+    valid_repositories = []
+    for repo_config in repositories:
+        if not (repo_config.get("repo") and repo_config.get("from_release")
+                and repo_config.get("to_release")):
+            print(f"Skipping invalid repository config: {repo_config}")
             continue
-        
-        # Store stats
-        if stats:
-            stats["repo"] = repo
-            stats["from_release"] = from_release
-            stats["to_release"] = to_release
-            all_stats.append(stats)
-        
-        # Generate AI summary
-        summary = generate_ai_summary(
-            diff_content, repo, from_release, to_release,
-            args.openai_api_key, args.azure_openai_api_key,
-            args.azure_openai_endpoint, args.azure_openai_version,
-            args.openai_model, args.max_tokens, args.temperature,
-            args.custom_prompt
-        )
-        
-        if summary:
-            all_summaries.append({
-                "repo": repo,
-                "from_release": from_release,
-                "to_release": to_release,
-                "summary": summary,
-                "stats": stats
-            })
-            brief_summary_parts.append(f"- **{repo}**: {from_release} → {to_release}")
+        valid_repositories.append(repo_config)
+
+    # Process repositories concurrently: each one is dominated by network I/O
+    # (GitHub compare + OpenAI completion), so threads give near-linear speedup.
+    if valid_repositories:
+        max_workers = min(8, len(valid_repositories))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(process_repository, valid_repositories))
+
+        if use_batch_api:
+            # Build the prompts for every fetched diff, resolve cache hits,
+            # and submit the misses as a single Batch API job.
+            batch_prompts = {}
+            batch_cache_keys = {}
+            resolved = {}
+            for index, (repo_config, (stats, summary, diff_content)) in enumerate(
+                    zip(valid_repositories, results)):
+                # A summary set here means process_repository already resolved
+                # it (e.g. the no-code-changes placeholder) - don't batch it
+                if not diff_content or summary is not None:
+                    continue
+                custom_id = str(index)
+                prompt = build_summary_prompt(
+                    diff_content, repo_config["repo"], repo_config["from_release"],
+                    repo_config["to_release"], args.custom_prompt
+                )
+                cache_key = _summary_cache_key(args.openai_model, args.temperature, prompt)
+                cached_summary = _read_cached_summary(cache_key)
+                if cached_summary:
+                    print(f"Using cached summary for {repo_config['repo']}")
+                    resolved[custom_id] = cached_summary
+                else:
+                    batch_prompts[custom_id] = prompt
+                    batch_cache_keys[custom_id] = cache_key
+
+            if batch_prompts:
+                try:
+                    batch_summaries = generate_batch_summaries(
+                        batch_prompts, args.openai_api_key, args.openai_model, args.max_tokens
+                    )
+                except Exception as e:
+                    print(f"Batch job failed: {e}")
+                    batch_summaries = {}
+                for custom_id, summary in batch_summaries.items():
+                    _write_cached_summary(batch_cache_keys[custom_id], summary)
+                resolved.update(batch_summaries)
+
+                # Summaries the batch job did not deliver (failure, timeout or
+                # per-request errors) fall back to the interactive path so no
+                # repo silently drops out of the notes
+                missing = [cid for cid in batch_prompts if cid not in resolved]
+                if missing:
+                    print(f"Falling back to interactive summarization for {len(missing)} repositor(y/ies)")
+                for custom_id in missing:
+                    repo_config = valid_repositories[int(custom_id)]
+                    _, _, diff_content = results[int(custom_id)]
+                    summary = generate_ai_summary(
+                        diff_content, repo_config["repo"], repo_config["from_release"],
+                        repo_config["to_release"], args.openai_api_key,
+                        args.azure_openai_api_key, args.azure_openai_endpoint,
+                        args.azure_openai_version, args.openai_model, args.max_tokens,
+                        args.temperature, args.custom_prompt
+                    )
+                    if summary:
+                        resolved[custom_id] = summary
+
+            results = [(stats,
+                        summary if summary is not None else resolved.get(str(index), ""),
+                        diff_content)
+                       for index, (stats, summary, diff_content) in enumerate(results)]
+
+        # Collect results in the original repository order
+        for repo_config, (stats, summary, diff_content) in zip(valid_repositories, results):
+            if diff_content:
+                repo_diffs[(repo_config["repo"], repo_config["from_release"],
+                            repo_config["to_release"])] = diff_content
+            if stats:
+                all_stats.append(stats)
+                total_commits += stats.get("total_commits", 0)
+                total_files += stats.get("files_changed", 0)
+            if summary:
+                all_summaries.append({
+                    "repo": repo_config["repo"],
+                    "from_release": repo_config["from_release"],
+                    "to_release": repo_config["to_release"],
+                    "summary": summary,
+                    "stats": stats
+                })
+                brief_summary_parts.append(
+                    f"- **{repo_config['repo']}**: {repo_config['from_release']} → {repo_config['to_release']}"
+                )
     
     # Process raw diffs
     raw_diff_file_stats = []  # Store per-file stats for raw diffs
@@ -661,58 +1360,29 @@ def main():
             diff_content_raw = raw_diff.get("diff", "")
             print(f"  [{idx}] {diff_name}: {len(diff_content_raw)} characters")
         
-        # Helper function to extract new icons from diff (same logic as repository processing)
-        def extract_new_icons_from_raw_diff(patch: str) -> list:
-            """Extract only newly added icon names from icons.js diff."""
-            import re
-            new_icons = []
-            for line in patch.split('\n'):
-                # Only look at added lines (starting with +, but not ++)
-                if line.startswith('+') and not line.startswith('++'):
-                    # Match export const/let/var iconName
-                    match = re.search(r'export\s+(?:const|let|var)\s+(\w+)', line)
-                    if match:
-                        new_icons.append(match.group(1))
-                        continue
-                    # Match object key patterns: iconName: or "iconName": or 'iconName':
-                    match = re.search(r'["\']?(\w+(?:-\w+)*)["\']?\s*:\s*[\'"`<{]', line)
-                    if match:
-                        icon_name = match.group(1)
-                        # Filter out common non-icon keys
-                        if icon_name not in ['viewBox', 'fill', 'stroke', 'width', 'height', 'd', 'path', 'xmlns', 'class', 'style']:
-                            new_icons.append(icon_name)
-            return new_icons
-        
-        # Combine all raw diffs into a single diff content
-        raw_diff_content = "\n### Raw Diffs\n\n"
+        # Combine all raw diffs into a single diff content (list-join, same
+        # as the compare path)
+        raw_diff_parts = ["\n### Raw Diffs\n\n"]
         for raw_diff in raw_diffs:
             diff_name = raw_diff.get("name", "unknown")
             diff_content_raw = raw_diff.get("diff", "")
             
             # Check if this is an icons.js file
-            is_icons_file = diff_name.lower().endswith(('icons.js', 'icons.ts', 'icons.jsx', 'icons.tsx'))
+            is_icons_file = diff_name.lower().endswith(ICON_FILE_SUFFIXES)
             
             if is_icons_file and diff_content_raw:
                 # For icon files, only report newly added icons
-                new_icons = extract_new_icons_from_raw_diff(diff_content_raw)
+                new_icons = extract_new_icons_from_diff(diff_content_raw)
                 if new_icons:
-                    raw_diff_content += f"Changes in file {diff_name}: New icons added: {', '.join(new_icons)}\n\n"
+                    raw_diff_parts.append(f"Changes in file {diff_name}: New icons added: {', '.join(new_icons)}\n\n")
                 else:
-                    raw_diff_content += f"Changes in file {diff_name}: Icon content updated (no new icons added)\n\n"
+                    raw_diff_parts.append(f"Changes in file {diff_name}: Icon content updated (no new icons added)\n\n")
             else:
                 # Include full diff for all other files (including indexes.txt)
-                raw_diff_content += f"Changes in file {diff_name}:\n{diff_content_raw if diff_content_raw else '(no diff content provided)'}\n\n"
+                raw_diff_parts.append(f"Changes in file {diff_name}:\n{diff_content_raw if diff_content_raw else '(no diff content provided)'}\n\n")
             
             # Calculate per-file statistics by counting diff lines
-            additions = 0
-            deletions = 0
-            if diff_content_raw:
-                for line in diff_content_raw.split('\n'):
-                    # Count lines starting with + or - (but not ++ or --)
-                    if line.startswith('+') and not line.startswith('++'):
-                        additions += 1
-                    elif line.startswith('-') and not line.startswith('--'):
-                        deletions += 1
+            additions, deletions = count_patch_changes(diff_content_raw)
             
             raw_diff_file_stats.append({
                 "file_name": diff_name,
@@ -720,15 +1390,22 @@ def main():
                 "deletions": deletions,
             })
         
-        # Generate AI summary for raw diffs
-        if raw_diff_content.strip() != "\n### Raw Diffs\n":
-            summary = generate_ai_summary(
-                raw_diff_content, "Raw Diffs", "N/A", "N/A",
-                args.openai_api_key, args.azure_openai_api_key,
-                args.azure_openai_endpoint, args.azure_openai_version,
-                args.openai_model, args.max_tokens, args.temperature,
-                args.custom_prompt
-            )
+        # Generate summary for raw diffs (AI, or per-file counts without LLM)
+        if len(raw_diff_parts) > 1:
+            raw_diff_content = "".join(raw_diff_parts)
+            if use_llm:
+                summary = generate_ai_summary(
+                    raw_diff_content, "Raw Diffs", "N/A", "N/A",
+                    args.openai_api_key, args.azure_openai_api_key,
+                    args.azure_openai_endpoint, args.azure_openai_version,
+                    args.openai_model, args.max_tokens, args.temperature,
+                    args.custom_prompt
+                )
+            else:
+                summary = "".join(
+                    f"- **{f['file_name']}**: +{f['additions']}/-{f['deletions']}\n"
+                    for f in raw_diff_file_stats
+                )
             
             if summary:
                 # Calculate total stats for raw diffs
@@ -745,21 +1422,16 @@ def main():
                     "file_stats": raw_diff_file_stats,  # Include per-file breakdown
                 }
                 all_stats.append(raw_diff_stats)
+                total_files += raw_diff_stats["files_changed"]
                 
-                # Calculate per-file change counts
-                raw_diff_files_with_counts = []
-                for d in raw_diffs:
-                    file_name = d.get("name", "unknown")
-                    diff_text = d.get("diff", "")
-                    additions = diff_text.count("\n+") + (1 if diff_text.startswith("+") else 0)
-                    deletions = diff_text.count("\n-") + (1 if diff_text.startswith("-") else 0)
-                    total_changes = additions + deletions
-                    raw_diff_files_with_counts.append({
-                        "name": file_name,
-                        "changes": total_changes
-                    })
+                # Per-file change counts, derived from the stats gathered in
+                # the loop above instead of recounting every diff
+                raw_diff_files_with_counts = [
+                    {"name": f["file_name"], "changes": f["additions"] + f["deletions"]}
+                    for f in raw_diff_file_stats
+                ]
                 
-                raw_diff_files = [d.get("name", "unknown") for d in raw_diffs]
+                raw_diff_files = [f["name"] for f in raw_diff_files_with_counts]
                 all_summaries.append({
                     "repo": "Raw Diffs",
                     "from_release": "N/A",
@@ -769,59 +1441,74 @@ def main():
                     "raw_diff_files": raw_diff_files
                 })
                 # Add each file as a separate bullet point with change count
-                for file_info in raw_diff_files_with_counts:
-                    brief_summary_parts.append(f"- **{file_info['name']}**: {file_info['changes']} change(s)")
+                brief_summary_parts.extend(
+                    f"- **{f['name']}**: {f['changes']} change(s)"
+                    for f in raw_diff_files_with_counts
+                )
     
     if not all_summaries:
         print("No summaries generated")
         return 1
     
     # Build the combined release notes
-    combined_notes = f"# {args.release_title}\n\n"
-    combined_notes += f"*Generated on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}*\n\n"
+    notes_parts = [f"# {args.release_title}\n\n",
+                   f"*Generated on: {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())}*\n\n"]
     
     # Add overview section
-    combined_notes += "## Overview\n\n"
-    combined_notes += "This release includes changes from the following repositories:\n\n"
+    notes_parts.append(_OVERVIEW_HEADER)
     for part in brief_summary_parts:
-        combined_notes += f"{part}\n"
-    combined_notes += "\n"
+        notes_parts.append(f"{part}\n")
+    notes_parts.append("\n")
     
     # Add statistics if enabled
     if include_stats and all_stats:
-        combined_notes += "## Statistics\n\n"
-        combined_notes += "| Repository | Commits | Files Changed | Additions | Deletions |\n"
-        combined_notes += "|------------|---------|---------------|-----------|----------|\n"
+        notes_parts.append(_STATS_TABLE_HEADER)
         for stat in all_stats:
-            # Check if this is a raw diff entry with per-file stats
-            if stat.get('repo') == 'Raw Diffs' and stat.get('file_stats'):
-                # First show the summary row for Raw Diffs
-                combined_notes += f"| **{stat['repo']}** | {stat['total_commits']} | {stat['files_changed']} | +{stat['additions']} | -{stat['deletions']} |\n"
-                # Then show per-file breakdown
-                for file_stat in stat['file_stats']:
-                    combined_notes += f"| ↳ {file_stat['file_name']} | - | 1 | +{file_stat['additions']} | -{file_stat['deletions']} |\n"
+            # Pull each field out once instead of re-hashing per placeholder
+            repo_name = stat.get('repo')
+            commits = stat['total_commits']
+            files_changed = stat['files_changed']
+            additions = stat['additions']
+            deletions = stat['deletions']
+            file_stats = stat.get('file_stats')
+            # Raw diff entries get a bold summary row plus a per-file breakdown
+            if repo_name == 'Raw Diffs' and file_stats:
+                notes_parts.append(_STATS_ROW_TPL.format(
+                    repo=f"**{repo_name}**", commits=commits, files=files_changed,
+                    additions=additions, deletions=deletions))
+                # Cap the breakdown so huge raw-diff batches cannot balloon the table
+                shown = file_stats[:args.max_files_in_table]
+                notes_parts.extend(
+                    _STATS_FILE_ROW_TPL.format(name=f['file_name'], additions=f['additions'],
+                                               deletions=f['deletions'])
+                    for f in shown)
+                remaining = len(file_stats) - len(shown)
+                if remaining:
+                    notes_parts.append(f"| ↳ … and {remaining} more file(s) | - | - | - | - |\n")
             else:
-                combined_notes += f"| {stat['repo']} | {stat['total_commits']} | {stat['files_changed']} | +{stat['additions']} | -{stat['deletions']} |\n"
-        combined_notes += "\n"
+                notes_parts.append(_STATS_ROW_TPL.format(
+                    repo=repo_name, commits=commits, files=files_changed,
+                    additions=additions, deletions=deletions))
+        notes_parts.append("\n")
     
     # Add individual repository summaries
-    combined_notes += "---\n\n"
+    notes_parts.append("---\n\n")
     
     for item in all_summaries:
-        combined_notes += f"## {item['repo']}\n\n"
-        combined_notes += f"**Release:** {item['from_release']} → {item['to_release']}\n\n"
-        combined_notes += item['summary']
-        combined_notes += "\n\n---\n\n"
+        notes_parts.append(f"## {item['repo']}\n\n")
+        notes_parts.append(f"**Release:** {item['from_release']} → {item['to_release']}\n\n")
+        notes_parts.append(item['summary'])
+        notes_parts.append("\n\n---\n\n")
     
     # Generate brief summary
-    brief_summary = f"Release notes generated for {len(all_summaries)} repositories. "
-    total_commits = sum(s.get("total_commits", 0) for s in all_stats)
-    total_files = sum(s.get("files_changed", 0) for s in all_stats)
-    brief_summary += f"Total: {total_commits} commits, {total_files} files changed."
+    brief_summary = (f"Release notes generated for {len(all_summaries)} repositories. "
+                     f"Total: {total_commits} commits, {total_files} files changed.")
     
     # Generate test plan if enabled
     test_plan = ""
-    should_generate_test_plan = args.generate_test_plan.lower() == "true"
+    if should_generate_test_plan and not use_llm:
+        print("Skipping test plan generation (LLM disabled)")
+        should_generate_test_plan = False
     frontend_context_file = args.frontend_context_file
     
     if should_generate_test_plan and frontend_context_file:
@@ -833,44 +1520,71 @@ def main():
         frontend_context = read_frontend_context(frontend_context_file)
         
         if frontend_context:
-            # Collect all diff content for test plan generation
-            all_diff_content = ""
+            # Collect all diff content for test plan generation as chunks,
+            # joined once at the call boundary. Whole diffs are added until
+            # the byte budget runs out, so no single diff is cut in half.
+            diff_chunks = []
+            budget = TEST_PLAN_DIFF_BUDGET
+            omitted_diffs = 0
             
-            # Collect diffs from repositories
+            # Reuse the diffs already fetched by the summary pass instead of
+            # hitting the compare API a second time.
             for repo_config in repositories:
-                repo = repo_config.get("repo")
-                from_release = repo_config.get("from_release")
-                to_release = repo_config.get("to_release")
-                
-                if all([repo, from_release, to_release]):
-                    diff_content, _ = get_compare_diff(
-                        args.github_api_url, repo, from_release, to_release, authorization_header
-                    )
-                    if diff_content:
-                        all_diff_content += diff_content + "\n"
+                key = (repo_config.get("repo"), repo_config.get("from_release"),
+                       repo_config.get("to_release"))
+                diff_content = repo_diffs.get(key)
+                if not diff_content:
+                    continue
+                if len(diff_content) + 1 > budget:
+                    omitted_diffs += 1
+                    continue
+                diff_chunks.append(diff_content + "\n")
+                budget -= len(diff_content) + 1
             
             # Collect raw diffs
             if raw_diffs:
-                all_diff_content += "\n### Raw Diffs\n\n"
+                diff_chunks.append("\n### Raw Diffs\n\n")
                 for raw_diff in raw_diffs:
-                    diff_name = raw_diff.get("name", "unknown")
-                    diff_content_raw = raw_diff.get("diff", "")
-                    all_diff_content += f"Changes in file {diff_name}:\n{diff_content_raw}\n\n"
+                    chunk = (f"Changes in file {raw_diff.get('name', 'unknown')}:\n"
+                             f"{raw_diff.get('diff', '')}\n\n")
+                    if len(chunk) > budget:
+                        omitted_diffs += 1
+                        continue
+                    diff_chunks.append(chunk)
+                    budget -= len(chunk)
+            
+            if omitted_diffs:
+                print(f"Test plan input: {omitted_diffs} diff(s) omitted to stay "
+                      f"within the {TEST_PLAN_DIFF_BUDGET} byte budget")
+                diff_chunks.append(f"\n(Note: {omitted_diffs} diff(s) omitted to stay within the input size budget)\n")
+            all_diff_content = "".join(diff_chunks)
             
-            # Generate the test plan
-            test_plan = generate_test_plan(
-                all_diff_content, frontend_context,
-                args.openai_api_key, args.azure_openai_api_key,
-                args.azure_openai_endpoint, args.azure_openai_version,
-                args.openai_model, args.max_tokens, args.temperature
+            # A test plan only makes sense when frontend code changed; judge
+            # by the changed filenames, not by substrings of patch content
+            changed_names = []
+            for stat in all_stats:
+                changed_names.extend(stat.get("changed_files", ()))
+                changed_names.extend(f["file_name"] for f in stat.get("file_stats", ()))
+            frontend_relevant = any(
+                name.lower().endswith(FRONTEND_EXTENSIONS) for name in changed_names
             )
+            if frontend_relevant:
+                test_plan = generate_test_plan(
+                    all_diff_content, frontend_context,
+                    args.openai_api_key, args.azure_openai_api_key,
+                    args.azure_openai_endpoint, args.azure_openai_version,
+                    args.openai_model, args.max_tokens, args.temperature
+                )
+            else:
+                print("No frontend-relevant changes found, skipping test plan")
+                test_plan = ""
             
             if test_plan:
                 # Add test plan section to the combined notes
-                combined_notes += "\n# Test Plan\n\n"
-                combined_notes += f"*Based on frontend context from: {frontend_context_file}*\n\n"
-                combined_notes += test_plan
-                combined_notes += "\n"
+                notes_parts.append("\n# Test Plan\n\n")
+                notes_parts.append(f"*Based on frontend context from: {frontend_context_file}*\n\n")
+                notes_parts.append(test_plan)
+                notes_parts.append("\n")
                 
                 print("Test plan generated successfully!")
             else:
@@ -880,13 +1594,17 @@ def main():
     elif should_generate_test_plan and not frontend_context_file:
         print("Warning: Test plan generation enabled but no frontend context file provided")
     
+    combined_notes = "".join(notes_parts)
+
     # Write outputs
-    write_github_output("release_notes", combined_notes)
-    write_github_output("summary", brief_summary)
-    write_github_output("test_plan", test_plan)
+    write_github_outputs({
+        "release_notes": combined_notes,
+        "summary": brief_summary,
+        "test_plan": test_plan,
+    })
     
     # Write to GitHub Actions summary
-    write_github_summary(combined_notes)
+    write_github_summary(notes_parts)
     
     print("\n" + "="*60)
     print("Release notes generated successfully!")